@@ -0,0 +1,31 @@
+"""
+Shared fixtures for the High School Management System API tests
+
+Under pytest-xdist every worker is a separate process with its own copy of
+the in-memory ``activities`` dict, so these fixtures only have to keep tests
+isolated within a single worker.
+"""
+
+import pytest
+from src.app import activities
+
+
+@pytest.fixture(scope="session")
+def _participants_snapshot():
+    """Capture the initial participant lists once per test session (per worker)"""
+    return {
+        name: tuple(details["participants"])
+        for name, details in activities.items()
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_activities(request, _participants_snapshot):
+    """Restore participant lists after each test not marked as readonly"""
+    readonly = request.node.get_closest_marker("readonly") is not None
+    yield
+    
+    if readonly:
+        return
+    for name, baseline in _participants_snapshot.items():
+        activities[name]["participants"] = list(baseline)